@@ -14,22 +14,50 @@
 # You should have received a copy of the GNU General Public License along with
 # satpy.  If not, see <http://www.gnu.org/licenses/>.
 """CF processing of pyresample area information."""
+from __future__ import annotations
+
 import logging
 
+import pyproj
 import xarray as xr
 from packaging.version import Version
 from pyresample.geometry import AreaDefinition, SwathDefinition
 
 logger = logging.getLogger(__name__)
 
+# technically 2.2, but important bug fixes in 2.4.1
+_PYPROJ_IS_SUPPORTED = Version(pyproj.__version__) >= Version("2.4.1")
+
+
+def _copy_data_array_attrs(data_arr: xr.DataArray) -> xr.DataArray:
+    """Copy the DataArray without copying its data, so that attributes and coordinates can be modified."""
+    data_arr = data_arr.copy(deep=False)
+    data_arr.attrs = dict(data_arr.attrs)
+    return data_arr
+
 
-def _add_lonlat_coords(data_arr: xr.DataArray) -> xr.DataArray:
+def _get_lonlats(area, chunks, lonlats_cache: dict | None = None):
+    """Get the longitudes and latitudes of `area`, reusing them from `lonlats_cache` if possible.
+
+    Only AreaDefinitions are cached: they are cheap to hash and compare, and
+    their longitudes and latitudes are expensive to compute. Swath definitions
+    already hold their longitudes and latitudes.
+    """
+    if lonlats_cache is None or not isinstance(area, AreaDefinition):
+        return area.get_lonlats(chunks=chunks)
+    key = (area, chunks)
+    if key not in lonlats_cache:
+        lonlats_cache[key] = area.get_lonlats(chunks=chunks)
+    return lonlats_cache[key]
+
+
+def _add_lonlat_coords(data_arr: xr.DataArray, lonlats_cache: dict | None = None) -> xr.DataArray:
     """Add 'longitude' and 'latitude' coordinates to DataArray."""
-    data_arr = data_arr.copy()
+    data_arr = _copy_data_array_attrs(data_arr)
     area = data_arr.attrs["area"]
     ignore_dims = {dim: 0 for dim in data_arr.dims if dim not in ["x", "y"]}
     chunks = getattr(data_arr.isel(**ignore_dims), "chunks", None)
-    lons, lats = area.get_lonlats(chunks=chunks)
+    lons, lats = _get_lonlats(area, chunks, lonlats_cache)
     data_arr["longitude"] = xr.DataArray(lons, dims=["y", "x"],
                                          attrs={"name": "longitude",
                                                  "standard_name": "longitude",
@@ -45,10 +73,7 @@ def _add_lonlat_coords(data_arr: xr.DataArray) -> xr.DataArray:
 
 def _create_grid_mapping(area):
     """Create the grid mapping instance for `area`."""
-    import pyproj
-
-    if Version(pyproj.__version__) < Version("2.4.1"):
-        # technically 2.2, but important bug fixes in 2.4.1
+    if not _PYPROJ_IS_SUPPORTED:
         raise ImportError("'cf' writer requires pyproj 2.4.1 or greater")
     # let pyproj do the heavily lifting (pyproj 2.0+ required)
     grid_mapping = area.crs.to_cf()
@@ -57,20 +82,26 @@ def _create_grid_mapping(area):
 
 def _add_grid_mapping(data_arr: xr.DataArray) -> tuple[xr.DataArray, xr.DataArray]:
     """Convert an area to at CF grid mapping."""
-    data_arr = data_arr.copy()
+    data_arr = _copy_data_array_attrs(data_arr)
     area = data_arr.attrs["area"]
     gmapping_var_name, attrs = _create_grid_mapping(area)
     data_arr.attrs["grid_mapping"] = gmapping_var_name
     return data_arr, xr.DataArray(0, attrs=attrs, name=gmapping_var_name)
 
 
-def area2cf(data_arr: xr.DataArray, include_lonlats: bool = False, got_lonlats: bool = False) -> list[xr.DataArray]:
-    """Convert an area to at CF grid mapping or lon and lats."""
+def area2cf(data_arr: xr.DataArray, include_lonlats: bool = False, got_lonlats: bool = False,
+            lonlats_cache: dict | None = None) -> list[xr.DataArray]:
+    """Convert an area to at CF grid mapping or lon and lats.
+
+    If a ``lonlats_cache`` dictionary is given, the longitudes and latitudes are
+    computed only once per area (and chunks) and shared among all DataArrays
+    converted with the same cache.
+    """
     res = []
     include_lonlats = include_lonlats or isinstance(data_arr.attrs["area"], SwathDefinition)
     is_area_def = isinstance(data_arr.attrs["area"], AreaDefinition)
     if not got_lonlats and include_lonlats:
-        data_arr = _add_lonlat_coords(data_arr)
+        data_arr = _add_lonlat_coords(data_arr, lonlats_cache=lonlats_cache)
     if is_area_def:
         data_arr, gmapping = _add_grid_mapping(data_arr)
         res.append(gmapping)
@@ -17,34 +17,48 @@
 from __future__ import annotations
 
 import datetime
+import functools
 import json
 import logging
-from collections import OrderedDict
 
 import numpy as np
 import xarray as xr
 
-from satpy.writers.utils import flatten_dict
+from satpy.writers.utils import flatten_dict, get_cached_by_id
 
 logger = logging.getLogger(__name__)
 
 
 class AttributeEncoder(json.JSONEncoder):
-    """JSON encoder for dataset attributes."""
+    """JSON encoder for dataset attributes.
+
+    Dictionaries, lists and tuples are iterated by the json encoder itself, which calls
+    :meth:`default` only for the objects it cannot serialize natively.
+    """
 
     def default(self, obj):
         """Return a json-serializable object for *obj*.
 
-        In order to facilitate decoding, elements in dictionaries, lists/tuples and multi-dimensional arrays are
-        encoded recursively.
+        Plain numeric arrays are converted at once. Elements of other arrays are left to
+        the json encoder, except for object arrays, which may hold arbitrary containers and
+        are thus encoded recursively.
         """
+        if isinstance(obj, np.ndarray):
+            if obj.dtype.kind in "iuf":
+                return obj.tolist()
+            if obj.dtype.kind == "O":
+                return self._encode_recursively(obj)
+            return list(obj)
+        return self._encode(obj)
+
+    def _encode_recursively(self, obj):
+        """Encode *obj* and the elements of the dictionaries, lists/tuples and arrays it contains."""
         if isinstance(obj, dict):
-            serialized = {}
-            for key, val in obj.items():
-                serialized[key] = self.default(val)
-            return serialized
+            return {key: self._encode_recursively(val) for key, val in obj.items()}
+        elif isinstance(obj, np.ndarray) and obj.dtype.kind in "iuf":
+            return obj.tolist()
         elif isinstance(obj, (list, tuple, np.ndarray)):
-            return [self.default(item) for item in obj]
+            return [self._encode_recursively(item) for item in obj]
         return self._encode(obj)
 
     def _encode(self, obj):
@@ -65,15 +79,21 @@ class AttributeEncoder(json.JSONEncoder):
         return str(obj)
 
 
-def _encode_numpy_array(obj):
-    """Encode numpy array as a netCDF4 serializable datatype."""
+@functools.cache
+def _get_nc4_dtypes():
+    """Get the set of numpy dtypes compatible with all netCDF4 backends."""
     from satpy.writers.cf_writer import NC4_DTYPES
 
+    return frozenset(np.dtype(dtype) for dtype in NC4_DTYPES)
+
+
+def _encode_numpy_array(obj):
+    """Encode numpy array as a netCDF4 serializable datatype."""
     # Only plain 1-d arrays are supported. Skip record arrays and multi-dimensional arrays.
     is_plain_1d = not obj.dtype.fields and len(obj.shape) <= 1
     if not is_plain_1d:
         raise ValueError("Only a 1D numpy array can be encoded as netCDF attribute.")
-    if obj.dtype in NC4_DTYPES:
+    if obj.dtype in _get_nc4_dtypes():
         return obj
     if obj.dtype == np.bool_:
         # Boolean arrays are not supported, convert to array of strings.
@@ -81,15 +101,17 @@ def _encode_numpy_array(obj):
     return obj.tolist()
 
 
+_ENCODE_AS_IS_TYPES = (int, float, str, np.integer, np.floating)
+
+
 def _encode_object(obj):
     """Try to encode `obj` as a netCDF/Zarr compatible datatype which most closely resembles the object's nature.
 
     Raises:
         ValueError if no such datatype could be found
     """
-    is_nonbool_int = isinstance(obj, int) and not isinstance(obj, (bool, np.bool_))
-    is_encode_type = isinstance(obj, (float, str, np.integer, np.floating))
-    if is_nonbool_int or is_encode_type:
+    # Bool has to be excluded, because it is a subclass of int
+    if isinstance(obj, _ENCODE_AS_IS_TYPES) and not isinstance(obj, bool):
         return obj
     elif isinstance(obj, np.ndarray):
         return _encode_numpy_array(obj)
@@ -120,35 +142,56 @@ def _encode_python_objects(obj):
     return dump
 
 
+@functools.singledispatch
 def _encode_to_cf(obj):
     """Encode the given object as a netcdf compatible datatype."""
-    try:
+    if hasattr(obj, "to_cf"):
         return obj.to_cf()
-    except AttributeError:
-        return _encode_python_objects(obj)
+    return _encode_python_objects(obj)
+
+
+@_encode_to_cf.register(str)
+@_encode_to_cf.register(int)
+@_encode_to_cf.register(float)
+def _encode_netcdf_compatible_to_cf(obj):
+    """Return objects which are already netcdf compatible as they are."""
+    return obj
+
+
+# Bool has to be registered separately, because it is a subclass of int
+_encode_to_cf.register(bool, _encode_python_objects)
 
+# Exact types of objects which are netcdf compatible as they are (so excluding bool)
+_NETCDF_COMPATIBLE_TYPES = frozenset({str, int, float})
 
-def encode_attrs_to_cf(attrs):
+
+def encode_attrs_to_cf(attrs, encode_cache=None):
     """Encode dataset attributes as a netcdf compatible datatype.
 
     Args:
         attrs (dict):
             Attributes to be encoded
+        encode_cache (dict, optional):
+            Cache of encoded values, to reuse the encoding of values shared among
+            several attribute dictionaries
     Returns:
         dict: Encoded (and sorted) attributes
 
     """
-    encoded_attrs = []
-    for key, val in sorted(attrs.items()):
-        if val is not None:
-            encoded_attrs.append((key, _encode_to_cf(val)))
-    return OrderedDict(encoded_attrs)
+    if all(type(val) in _NETCDF_COMPATIBLE_TYPES for val in attrs.values()):
+        # Fast path for the common case of plain attributes, which need no encoding
+        return dict(sorted(attrs.items()))
+    if encode_cache is None:
+        return {key: _encode_to_cf(val) for key, val in sorted(attrs.items()) if val is not None}
+    return {key: get_cached_by_id(val, encode_cache, _encode_to_cf)
+            for key, val in sorted(attrs.items()) if val is not None}
 
 
 def preprocess_attrs(
         data_arr: xr.DataArray,
         flatten_attrs: bool,
-        exclude_attrs: list[str] | None
+        exclude_attrs: list[str] | None,
+        encode_cache: dict | None = None
 ) -> xr.DataArray:
     """Preprocess DataArray attributes to be written into CF-compliant netCDF/Zarr."""
     _drop_attrs(data_arr, exclude_attrs)
@@ -161,7 +204,7 @@ def preprocess_attrs(
     if flatten_attrs:
         data_arr.attrs = flatten_dict(data_arr.attrs)
 
-    data_arr.attrs = encode_attrs_to_cf(data_arr.attrs)
+    data_arr.attrs = encode_attrs_to_cf(data_arr.attrs, encode_cache=encode_cache)
 
     return data_arr
 
@@ -170,41 +213,26 @@ def _drop_attrs(
         data_arr: xr.DataArray,
         user_excluded_attrs: list[str] | None
 ) -> None:
-    """Remove undesirable attributes."""
-    attrs_to_drop = (
-            (user_excluded_attrs or []) +
-            _get_satpy_attrs(data_arr) +
-            _get_none_attrs(data_arr) +
-            ["area"]
-    )
-    for key in attrs_to_drop:
-        data_arr.attrs.pop(key, None)
-
-
-def _get_satpy_attrs(data_arr: xr.DataArray) -> list[str]:
-    """Remove _satpy attribute."""
-    return [key for key in data_arr.attrs if key.startswith("_satpy")] + ["_last_resampler"]
-
-
-def _get_none_attrs(data_arr: xr.DataArray) -> list[str]:
-    """Remove attribute keys with None value."""
-    return [attr_name for attr_name, attr_val in data_arr.attrs.items() if attr_val is None]
+    """Remove undesirable attributes: user-excluded, satpy-internal, None-valued and empty ancillary variables."""
+    excluded_attrs = {"area", "_last_resampler", *(user_excluded_attrs or ())}
+    data_arr.attrs = {key: val for key, val in data_arr.attrs.items()
+                      if val is not None and key not in excluded_attrs and not key.startswith("_satpy")
+                      and not (key == "ancillary_variables" and len(val) == 0)}
 
 
 def _add_ancillary_variables_attrs(data_arr: xr.DataArray) -> None:
     """Replace ancillary_variables DataArray with a list of their name."""
-    list_ancillary_variable_names = [da_ancillary.attrs["name"]
-                                     for da_ancillary in data_arr.attrs.get("ancillary_variables", [])]
-    if list_ancillary_variable_names:
-        data_arr.attrs["ancillary_variables"] = " ".join(list_ancillary_variable_names)
-    else:
-        data_arr.attrs.pop("ancillary_variables", None)
+    ancillary_variables = data_arr.attrs.get("ancillary_variables")
+    if ancillary_variables:
+        data_arr.attrs["ancillary_variables"] = " ".join(da_ancillary.attrs["name"]
+                                                         for da_ancillary in ancillary_variables)
 
 
 def _format_prerequisites_attrs(data_arr: xr.DataArray) -> None:
     """Reformat prerequisites attribute value to string."""
     if "prerequisites" in data_arr.attrs:
-        data_arr.attrs["prerequisites"] = [np.bytes_(str(prereq)) for prereq in data_arr.attrs["prerequisites"]]
+        # Plain strings are netCDF compatible as they are, so they pass attribute encoding without conversion
+        data_arr.attrs["prerequisites"] = [str(prereq) for prereq in data_arr.attrs["prerequisites"]]
 
 
 def _add_history(attrs):
@@ -224,7 +252,7 @@ def preprocess_header_attrs(header_attrs, flatten_attrs=False):
     if header_attrs is not None:
         if flatten_attrs:
             header_attrs = flatten_dict(header_attrs)
-        header_attrs = encode_attrs_to_cf(header_attrs)  # OrderedDict
+        header_attrs = encode_attrs_to_cf(header_attrs)
     else:
         header_attrs = {}
     header_attrs = _add_history(header_attrs)
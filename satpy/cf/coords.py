@@ -6,25 +6,32 @@ import warnings
 from collections import defaultdict
 from contextlib import suppress
 
+import dask.array as da
 import numpy as np
 import xarray as xr
 from dask.base import tokenize
 from pyproj import CRS
 from pyresample.geometry import AreaDefinition, SwathDefinition
 
+from satpy.writers.utils import get_cached_by_id
+
 logger = logging.getLogger(__name__)
 
 
 EPOCH = u"seconds since 1970-01-01 00:00:00"
 
 
-def add_xy_coords_attrs(data_arr: xr.DataArray) -> xr.DataArray:
-    """Add relevant attributes to x, y coordinates."""
+def add_xy_coords_attrs(data_arr: xr.DataArray, crs_cache: dict | None = None) -> xr.DataArray:
+    """Add relevant attributes to x, y coordinates.
+
+    If a ``crs_cache`` dictionary is given, whether a CRS is projected is determined
+    only once per CRS definition among the DataArrays using the same cache.
+    """
     # If there are no coords, return dataarray
     if not data_arr.coords.keys() & {"x", "y", "crs"}:
         return data_arr
     # If projected area
-    if _is_projected(data_arr):
+    if _is_projected(data_arr, crs_cache):
         data_arr = _add_xy_projected_coords_attrs(data_arr)
     else:
         data_arr = _add_xy_geographic_coords_attrs(data_arr)
@@ -33,11 +40,11 @@ def add_xy_coords_attrs(data_arr: xr.DataArray) -> xr.DataArray:
     return data_arr
 
 
-def _is_projected(data_arr: xr.DataArray) -> bool:
+def _is_projected(data_arr: xr.DataArray, crs_cache: dict | None = None) -> bool:
     """Guess whether data are projected or not."""
     crs = _try_to_get_crs(data_arr)
     if crs:
-        return crs.is_projected
+        return _is_crs_projected(crs, crs_cache)
     units = _try_get_units_from_coords(data_arr)
     if units:
         if units.endswith("m"):
@@ -48,6 +55,20 @@ def _is_projected(data_arr: xr.DataArray) -> bool:
     return True
 
 
+def _is_crs_projected(crs: CRS, crs_cache: dict | None) -> bool:
+    """Tell whether `crs` is projected, reusing the result for equal CRSs.
+
+    Every DataArray holds its own copy of the CRS, so the cache is keyed on
+    the CRS definition, which is much cheaper to get than the projection.
+    """
+    if crs_cache is None:
+        return crs.is_projected
+    key = crs.srs
+    if key not in crs_cache:
+        crs_cache[key] = crs.is_projected
+    return crs_cache[key]
+
+
 def _is_area(data_arr: xr.DataArray) -> bool:
      return isinstance(data_arr.attrs["area"], AreaDefinition)
 
@@ -82,22 +103,18 @@ def _try_get_units_from_coords(data_arr: xr.DataArray) -> str | None:
 def _add_xy_projected_coords_attrs(data_arr: xr.DataArray, x: str = "x", y: str = "y") -> xr.DataArray:
     """Add relevant attributes to x, y coordinates of a projected CRS."""
     if x in data_arr.coords:
-        data_arr[x].attrs["standard_name"] = "projection_x_coordinate"
-        data_arr[x].attrs["units"] = "m"
+        data_arr[x].attrs.update(standard_name="projection_x_coordinate", units="m")
     if y in data_arr.coords:
-        data_arr[y].attrs["standard_name"] = "projection_y_coordinate"
-        data_arr[y].attrs["units"] = "m"
+        data_arr[y].attrs.update(standard_name="projection_y_coordinate", units="m")
     return data_arr
 
 
 def _add_xy_geographic_coords_attrs(data_arr: xr.DataArray, x: str = "x", y: str = "y") -> xr.DataArray:
     """Add relevant attributes to x, y coordinates of a geographic CRS."""
     if x in data_arr.coords:
-        data_arr[x].attrs["standard_name"] = "longitude"
-        data_arr[x].attrs["units"] = "degrees_east"
+        data_arr[x].attrs.update(standard_name="longitude", units="degrees_east")
     if y in data_arr.coords:
-        data_arr[y].attrs["standard_name"] = "latitude"
-        data_arr[y].attrs["units"] = "degrees_north"
+        data_arr[y].attrs.update(standard_name="latitude", units="degrees_north")
     return data_arr
 
 
@@ -119,7 +136,8 @@ def set_cf_time_info(data_arr: xr.DataArray, epoch: str | None) -> xr.DataArray:
     data_arr["time"].attrs["standard_name"] = "time"
     data_arr["time"].attrs.pop("bounds", None)
 
-    if "time" not in data_arr.dims and data_arr["time"].size not in data_arr.shape:
+    # A time coordinate along another dimension (e.g. scanline times) needs no time dimension
+    if "time" not in data_arr.dims and data_arr["time"].ndim == 0:
         data_arr = data_arr.expand_dims("time")
 
     return data_arr
@@ -137,10 +155,11 @@ def _is_lon_or_lat_dataarray(data_arr: xr.DataArray) -> bool:
 
 def _get_is_nondimensional_coords_dict(data_arrays: dict[str, xr.DataArray]) -> dict[str, bool]:
     tokens = defaultdict(set)
+    token_cache = {}
     for data_arr in data_arrays.values():
         for coord_name in data_arr.coords:
             if not _is_lon_or_lat_dataarray(data_arr[coord_name]) and coord_name not in data_arr.dims:
-                tokens[coord_name].add(tokenize(data_arr[coord_name].data))
+                tokens[coord_name].add(get_cached_by_id(data_arr[coord_name].data, token_cache, tokenize))
     return dict([(coord_name, len(tokens) == 1) for coord_name, tokens in tokens.items()])
 
 
@@ -154,11 +173,15 @@ def _warn_if_pretty_but_not_unique(pretty, coord_name):
         )
 
 
-def _rename_coords(data_arrays: dict[str, xr.DataArray], coord_name: str) -> dict[str, xr.DataArray]:
-    """Rename coordinates in the datasets."""
+def _rename_coords(data_arrays: dict[str, xr.DataArray], coord_names: set[str]) -> dict[str, xr.DataArray]:
+    """Rename coordinates in the datasets.
+
+    All coordinates of a dataset are renamed at once, to avoid creating a new
+    DataArray for each renamed coordinate.
+    """
     for name, dataarray in data_arrays.items():
-        if coord_name in dataarray.coords:
-            rename = {coord_name: f"{name}_{coord_name}"}
+        rename = {coord_name: f"{name}_{coord_name}" for coord_name in dataarray.coords if coord_name in coord_names}
+        if rename:
             data_arrays[name] = dataarray.rename(rename)
     return data_arrays
 
@@ -195,28 +218,42 @@ def ensure_unique_nondimensional_coords(
     is_coords_unique_dict = _get_is_nondimensional_coords_dict(data_arrays)
 
     # Prepend dataset name, if not unique or no pretty-format desired
-    new_dict_dataarrays = data_arrays.copy()
+    coords_to_rename = set()
     for coord_name, unique in is_coords_unique_dict.items():
         if not pretty or not unique:
             _warn_if_pretty_but_not_unique(pretty, coord_name)
-            new_dict_dataarrays = _rename_coords(new_dict_dataarrays, coord_name)
-    return new_dict_dataarrays
+            coords_to_rename.add(coord_name)
+    return _rename_coords(data_arrays.copy(), coords_to_rename)
 
 
 def check_unique_projection_coords(data_arrays: dict[str, xr.DataArray]) -> None:
     """Check that all datasets share the same projection coordinates x/y."""
+    if len(data_arrays) <= 1:
+        return
     unique_x = set()
     unique_y = set()
     for dataarray in data_arrays.values():
         if "y" in dataarray.dims:
-            token_y = tokenize(dataarray["y"].data)
-            unique_y.add(token_y)
+            unique_y.add(_get_xy_fingerprint(dataarray["y"]))
         if "x" in dataarray.dims:
-            token_x = tokenize(dataarray["x"].data)
-            unique_x.add(token_x)
-    if len(unique_x) > 1 or len(unique_y) > 1:
-        raise ValueError("Datasets to be saved in one file (or one group) must have identical projection coordinates."
-                         "Please group them by area or save them in separate files.")
+            unique_x.add(_get_xy_fingerprint(dataarray["x"]))
+        if len(unique_x) > 1 or len(unique_y) > 1:
+            raise ValueError("Datasets to be saved in one file (or one group) must have identical projection "
+                             "coordinates. Please group them by area or save them in separate files.")
+
+
+def _get_xy_fingerprint(coord: xr.DataArray) -> tuple:
+    """Get a cheap hashable fingerprint of a x/y projection coordinate.
+
+    Projection coordinates are small 1D numpy arrays, so comparing their raw
+    buffer is much cheaper than going through :func:`dask.base.tokenize`.
+    Dask-backed coordinates are identified by their graph name and chunks.
+    """
+    data = coord.data
+    if isinstance(data, da.Array):
+        return data.name, data.chunks
+    data = np.asarray(data)
+    return data.dtype.str, data.shape, data.tobytes()
 
 
 def add_coordinates_attrs_coords(data_arrays: dict[str, xr.DataArray]) -> dict[str, xr.DataArray]:
@@ -231,15 +268,22 @@ def add_coordinates_attrs_coords(data_arrays: dict[str, xr.DataArray]) -> dict[s
     In the final call to `xr.Dataset.to_netcdf()` all coordinate relations will be resolved
     and the `coordinates` attributes be set automatically.
     """
+    # Adding coordinates does not change the dimensions, so they can be collected once
+    dims_dict = {name: set(dataarray.dims) for name, dataarray in data_arrays.items()}
     for dataarray_name in data_arrays.keys():
         data_arrays = _add_declared_coordinates(data_arrays,
-                                                dataarray_name=dataarray_name)
+                                                dataarray_name=dataarray_name,
+                                                dims_dict=dims_dict)
         # Drop 'coordinates' attribute in any case to avoid conflicts in xr.Dataset.to_netcdf()
         data_arrays[dataarray_name].attrs.pop("coordinates", None)
     return data_arrays
 
 
-def _add_declared_coordinates(data_arrays: dict[str, xr.DataArray], dataarray_name: str) -> dict[str, xr.DataArray]:
+def _add_declared_coordinates(
+        data_arrays: dict[str, xr.DataArray],
+        dataarray_name: str,
+        dims_dict: dict[str, set[str]]
+) -> dict[str, xr.DataArray]:
     """Add declared coordinates to the dataarray if they exist."""
     dataarray = data_arrays[dataarray_name]
     declared_coordinates = _get_coordinates_list(dataarray)
@@ -247,20 +291,20 @@ def _add_declared_coordinates(data_arrays: dict[str, xr.DataArray], dataarray_na
         if coord not in dataarray.coords:
             data_arrays = _try_add_coordinate(data_arrays,
                                               dataarray_name=dataarray_name,
-                                              coord=coord)
+                                              coord=coord,
+                                              dims_dict=dims_dict)
     return data_arrays
 
 
 def _try_add_coordinate(
         data_arrays: dict[str, xr.DataArray],
         dataarray_name: str,
-        coord: str
+        coord: str,
+        dims_dict: dict[str, set[str]]
 ) -> dict[str, xr.DataArray]:
     """Try to add a coordinate to the dataarray, warn if not possible."""
     try:
-        dataarray_dims = set(data_arrays[dataarray_name].dims)
-        coordinate_dims = set(data_arrays[coord].dims)
-        dimensions_to_squeeze = list(coordinate_dims - dataarray_dims)
+        dimensions_to_squeeze = list(dims_dict[coord] - dims_dict[dataarray_name])
         data_arrays[dataarray_name][coord] = data_arrays[coord].squeeze(dimensions_to_squeeze, drop=True)
     except KeyError:
         warnings.warn(
@@ -273,7 +317,9 @@ def _try_add_coordinate(
 
 def _get_coordinates_list(data_arr: xr.DataArray) -> list[str]:
     """Return a list with the coordinates names specified in the 'coordinates' attribute."""
-    declared_coordinates = data_arr.attrs.get("coordinates", [])
+    declared_coordinates = data_arr.attrs.get("coordinates")
+    if not declared_coordinates:
+        return []
     if isinstance(declared_coordinates, str):
         declared_coordinates = declared_coordinates.split(" ")
     return declared_coordinates
@@ -42,7 +42,10 @@ def _preprocess_data_array_name(dataarray, numeric_name_prefix, include_orig_nam
     """Change the DataArray name by prepending numeric_name_prefix if the name is a digit."""
     original_name = None
     named_has_changed = False
-    dataarray = dataarray.copy()
+    # Only attributes, encoding and coordinates are modified, so the data are not copied
+    dataarray = dataarray.copy(deep=False)
+    dataarray.attrs = dict(dataarray.attrs)
+    dataarray.encoding = dict(dataarray.encoding)
     if "name" in dataarray.attrs:
         original_name = dataarray.attrs.pop("name")
         original_name, new_name = _handle_data_array_name(original_name, numeric_name_prefix)
@@ -59,7 +62,9 @@ def make_cf_data_array(dataarray,
                        flatten_attrs=False,
                        exclude_attrs=None,
                        include_orig_name=True,
-                       numeric_name_prefix="CHANNEL_"):
+                       numeric_name_prefix="CHANNEL_",
+                       crs_cache=None,
+                       encode_cache=None):
     """Make the xr.DataArray CF-compliant.
 
     Args:
@@ -72,6 +77,10 @@ def make_cf_data_array(dataarray,
             Defaults to True.
         numeric_name_prefix (str, optional): Prepend dataset name with this if starting with a digit.
             Defaults to ``"CHANNEL_"``.
+        crs_cache (dict, optional): Cache of CRS properties, to be shared among DataArrays converted
+            together. Defaults to None (no caching).
+        encode_cache (dict, optional): Cache of encoded attribute values, to be shared among DataArrays
+            converted together. Defaults to None (no caching).
 
     Returns:
         xr.DataArray: A CF-compliant xr.DataArray.
@@ -81,8 +90,9 @@ def make_cf_data_array(dataarray,
                                             include_orig_name=include_orig_name)
     dataarray = preprocess_attrs(data_arr=dataarray,
                                  flatten_attrs=flatten_attrs,
-                                 exclude_attrs=exclude_attrs)
-    dataarray = add_xy_coords_attrs(dataarray)
+                                 exclude_attrs=exclude_attrs,
+                                 encode_cache=encode_cache)
+    dataarray = add_xy_coords_attrs(dataarray, crs_cache=crs_cache)
     if "time" in dataarray.coords:
         dataarray = set_cf_time_info(dataarray, epoch=epoch)
     return dataarray
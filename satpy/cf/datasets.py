@@ -25,13 +25,18 @@ logger = logging.getLogger(__name__)
 
 
 def _get_extra_ds(dataarray, keys=None):
-    """Get the ancillary_variables DataArrays associated to a dataset."""
+    """Get the ancillary_variables DataArrays associated to a dataset.
+
+    ``keys`` is the set of ancillary variable names already visited. It is
+    updated in place while walking the ancillary variables.
+    """
     dict_datarrays = {}
     # Retrieve ancillary variable datarrays
-    for ancillary_dataarray in dataarray.attrs.get("ancillary_variables", []):
+    ancillary_dataarrays = dataarray.attrs.get("ancillary_variables", ())
+    for ancillary_dataarray in ancillary_dataarrays:
         ancillary_variable = ancillary_dataarray.name
         if keys and ancillary_variable not in keys:
-            keys.append(ancillary_variable)
+            keys.add(ancillary_variable)
             dict_datarrays.update(_get_extra_ds(ancillary_dataarray, keys=keys))
     # Add input dataarray
     dict_datarrays[dataarray.attrs["name"]] = dataarray
@@ -103,19 +108,22 @@ def _collect_cf_dataset(list_dataarrays,
     # Check if one DataArray in the collection has 'longitude' or 'latitude'
     got_lonlats = has_projection_coords(dict_dataarrays)
 
-    # Sort dictionary by keys name
-    dict_dataarrays = dict(sorted(dict_dataarrays.items()))
-
     dict_cf_dataarrays = {}
-    for dataarray in dict_dataarrays.values():
+    # Longitudes and latitudes are computed only once per area, CRS properties and
+    # encodings of shared attribute values once per dataset
+    lonlats_cache = {}
+    crs_cache = {}
+    encode_cache = {}
+    # Process the DataArrays sorted by name
+    for _, dataarray in sorted(dict_dataarrays.items()):
         dataarray_type = dataarray.dtype
         if dataarray_type not in CF_DTYPES:
             warnings.warn(
                 f"dtype {dataarray_type} not compatible with {CF_VERSION}.",
                 stacklevel=3
             )
-        # Deep copy the datarray since adding/modifying attributes and coordinates
-        dataarray = dataarray.copy(deep=True)
+        # The datarray is not copied here: area2cf and make_cf_data_array copy it
+        # (without its data) before adding/modifying attributes and coordinates
 
         # Add CF-compliant area information from the pyresample area
         # - If include_lonlats=True, add latitude and longitude coordinates
@@ -125,7 +133,8 @@ def _collect_cf_dataset(list_dataarrays,
         try:
             list_new_dataarrays = area2cf(dataarray,
                                           include_lonlats=include_lonlats,
-                                          got_lonlats=got_lonlats)
+                                          got_lonlats=got_lonlats,
+                                          lonlats_cache=lonlats_cache)
         except KeyError:
             list_new_dataarrays = [dataarray]
 
@@ -139,7 +148,9 @@ def _collect_cf_dataset(list_dataarrays,
                                                flatten_attrs=flatten_attrs,
                                                exclude_attrs=exclude_attrs,
                                                include_orig_name=include_orig_name,
-                                               numeric_name_prefix=numeric_name_prefix)
+                                               numeric_name_prefix=numeric_name_prefix,
+                                               crs_cache=crs_cache,
+                                               encode_cache=encode_cache)
             dict_cf_dataarrays[new_dataarray.name] = new_dataarray
 
     # Check all DataArrays have same projection coordinates
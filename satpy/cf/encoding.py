@@ -15,6 +15,8 @@
 # satpy.  If not, see <http://www.gnu.org/licenses/>.
 """CF encoding."""
 import logging
+import math
+import warnings
 
 import numpy as np
 import xarray as xr
@@ -22,23 +24,110 @@ from xarray.coding.times import CFDatetimeCoder
 
 logger = logging.getLogger(__name__)
 
+# Encoding keys by which users specify (or disable) compression
+_COMPRESSION_KEYS = {"compression", "zlib", "szip", "zstd", "bzip2", "blosc"}
+
+# Algorithms supported for default compression
+_COMPRESSION_ALGORITHMS = {"zlib", "zstd", "blosc_zstd"}
+
+# Encoding keys by which users specify packing or quantization
+_QUANTIZATION_KEYS = {"scale_factor", "add_offset", "significant_digits", "least_significant_digit"}
+
+# Encoding keys describing the source a variable was read from
+_SOURCE_ENCODING_KEYS = {"source", "original_shape", "preferred_chunks"}
+
+# Target size of default on-disk chunks
+_TARGET_CHUNK_BYTES = 4 * 1024 * 1024
+
 
 def _set_default_chunks(encoding, dataset):
-    """Update encoding to preserve current dask chunks.
+    """Set on-disk chunks of dask-backed variables to whole multiples of their dask chunks.
 
-    Existing user-defined chunks take precedence.
+    Small dask chunks are enlarged towards a size of about 4 MiB, see
+    :func:`_enlarge_chunks`, and :func:`align_dask_chunks` rechunks the dask arrays
+    accordingly before writing. Existing user-defined chunks take precedence.
     """
     for var_name, variable in dataset.variables.items():
         if variable.chunks:
-            chunks = tuple(
-                np.stack([variable.data.chunksize,
-                          variable.shape]).min(axis=0)
-            )  # Chunksize may not exceed shape
+            # Chunksize may not exceed shape
+            chunks = tuple(min(chunk, size) for chunk, size in zip(variable.data.chunksize, variable.shape))
+            chunks = _enlarge_chunks(chunks, variable)
             encoding.setdefault(var_name, {})
             encoding[var_name].setdefault("chunksizes", chunks)
     return encoding
 
 
+def _enlarge_chunks(chunks, variable):
+    """Enlarge the given chunks towards a size of about 4 MiB.
+
+    Tiny on-disk chunks compress badly and are slow to read and write. Each chunk is
+    enlarged by an integer factor, so that on-disk chunks are made up of whole dask
+    chunks. Chunks never exceed the shape of the variable, and the time dimension is
+    not enlarged.
+    """
+    chunks = list(chunks)
+    growable = [idx for idx, dim in enumerate(variable.dims)
+                if dim != "time" and chunks[idx] < variable.shape[idx]]
+    # Enlarge the innermost dimensions first, spreading the enlargement over the remaining ones
+    for num_left in range(len(growable), 0, -1):
+        idx = growable[num_left - 1]
+        chunk_bytes = variable.dtype.itemsize * math.prod(chunks)
+        if not chunk_bytes:
+            break
+        factor = int((_TARGET_CHUNK_BYTES / chunk_bytes) ** (1 / num_left))
+        if factor > 1:
+            chunks[idx] = min(chunks[idx] * factor, variable.shape[idx])
+    return tuple(chunks)
+
+
+def _set_default_compressed_chunks(encoding, dataset):
+    """Set chunks of compressed numpy-backed data variables without user-defined chunks.
+
+    Otherwise the netCDF library chooses the chunks of compressed variables on its own,
+    which are often tiny. Leading dimensions get a chunksize of one, the last two a square
+    of about 4 MiB aligned to a power of two, see :func:`_get_default_chunksizes`. Variables
+    fitting into a single such chunk are left alone.
+    """
+    for var_name in dataset.data_vars:
+        variable = dataset.variables[var_name]
+        if variable.chunks or variable.ndim < 2 or variable.nbytes <= _TARGET_CHUNK_BYTES:
+            continue
+        var_encoding = encoding.get(var_name, variable.encoding)
+        is_compressed = any(var_encoding.get(key) for key in _COMPRESSION_KEYS)
+        if is_compressed and not var_encoding.keys() & {"chunksizes", "contiguous"}:
+            chunks = {"chunksizes": _get_default_chunksizes(variable)}
+            _set_variable_encoding_defaults(encoding, dataset, var_name, chunks, {"chunksizes"})
+    return encoding
+
+
+def _get_default_chunksizes(variable):
+    """Get chunksizes of about 4 MiB, square in the last two dimensions and aligned to a power of two."""
+    side = 2 ** int(math.log2(math.sqrt(_TARGET_CHUNK_BYTES // variable.dtype.itemsize)))
+    chunks = (1,) * (variable.ndim - 2) + (side, side)
+    return tuple(min(chunk, size) for chunk, size in zip(chunks, variable.shape))
+
+
+def align_dask_chunks(dataset, encoding):
+    """Rechunk dask arrays to the on-disk chunks given in the encoding, where these are larger.
+
+    Writing dask chunks smaller than the on-disk chunks (see :func:`_enlarge_chunks`) makes
+    the netCDF library read, decompress and rewrite each on-disk chunk several times. With
+    aligned chunks, every dask chunk is written as exactly one on-disk chunk.
+    """
+    rechunked = {}
+    for var_name, variable in dataset.variables.items():
+        if not variable.chunks:
+            continue
+        chunksizes = encoding.get(var_name, variable.encoding).get("chunksizes")
+        if chunksizes is None or len(chunksizes) != variable.ndim:
+            continue
+        if any(chunk > dask_chunk for chunk, dask_chunk in zip(chunksizes, variable.data.chunksize)):
+            rechunked[var_name] = variable.chunk(dict(zip(variable.dims, chunksizes)))
+    if not rechunked:
+        return dataset
+    return dataset.assign(rechunked)
+
+
 def _set_default_fill_value(encoding, dataset):
     """Set default fill values.
 
@@ -96,16 +185,153 @@ def _update_encoding_dataset_names(encoding, dataset, numeric_name_prefix):
     return encoding
 
 
-def update_encoding(dataset, to_engine_kwargs, numeric_name_prefix="CHANNEL_"):
+def _get_default_compression(engine, spec=True):
+    """Get default compression settings for the given netCDF engine.
+
+    ``spec`` is either True, for fast default settings, or a dictionary with the compression
+    ``algorithm`` (one of 'zlib', 'zstd' and 'blosc_zstd') and optionally its ``level``.
+    By default, Zstandard is used with the h5netcdf engine if the ``hdf5plugin`` package is
+    installed, otherwise a low zlib compression level. Blosc is only used with h5netcdf,
+    the netcdf4 engine uses plain Zstandard instead. If the requested algorithm is not
+    available for the engine, zlib is used instead, with a warning.
+    """
+    if spec is True:
+        algorithm, level = ("zstd", 1) if engine == "h5netcdf" else ("zlib", 1)
+    else:
+        algorithm = spec["algorithm"]
+        level = spec.get("level", 1)
+        if algorithm not in _COMPRESSION_ALGORITHMS:
+            raise ValueError(f"Unsupported compression algorithm '{algorithm}', "
+                             f"expected one of {sorted(_COMPRESSION_ALGORITHMS)}.")
+    if algorithm != "zlib":
+        compression = _get_engine_compression(engine, algorithm, level)
+        if compression is not None:
+            return compression
+        message = f"Compression '{algorithm}' is not available for engine {engine}, using zlib."
+        if spec is True:
+            logger.debug(message)
+        else:
+            warnings.warn(message, UserWarning, stacklevel=3)
+    return {"zlib": True, "complevel": min(level, 9), "shuffle": True}
+
+
+def _get_engine_compression(engine, algorithm, level):
+    """Get Zstandard-based compression settings for the given engine, or None if not available."""
+    if engine == "h5netcdf":
+        try:
+            import hdf5plugin
+        except ImportError:
+            return None
+        if algorithm == "blosc_zstd":
+            # Blosc shuffles the bytes itself
+            return dict(hdf5plugin.Blosc(cname="zstd", clevel=level, shuffle=hdf5plugin.Blosc.SHUFFLE))
+        return {**hdf5plugin.Zstd(clevel=level), "shuffle": True}
+    if engine in (None, "netcdf4"):
+        try:
+            import netCDF4
+        except ImportError:
+            return None
+        # Plain Zstandard is used instead of Blosc, as the Blosc filter of the netCDF library
+        # fails on incompressible data
+        if getattr(netCDF4, "__has_zstandard_support__", False):
+            return {"compression": "zstd", "complevel": level, "shuffle": True}
+    return None
+
+
+def _set_default_compression(encoding, dataset, compression):
+    """Set default compression of the data variables.
+
+    Compression settings defined by the user, either in the encoding dictionary or in
+    the encoding attribute of the variable, take precedence.
+    """
+    for var_name in dataset.data_vars:
+        if not dataset.variables[var_name].ndim:
+            # Compression is not applicable to scalars
+            continue
+        _set_variable_encoding_defaults(encoding, dataset, var_name, compression, _COMPRESSION_KEYS)
+    return encoding
+
+
+def _set_default_bitround(encoding, dataset, bitround):
+    """Set default BitRound quantization of float32 data variables.
+
+    ``bitround`` is either the number of mantissa bits to keep for all float32 data variables,
+    or a dictionary with the number of bits per variable name. Variables with user-defined
+    packing or quantization are left untouched.
+    """
+    for var_name in dataset.data_vars:
+        if dataset.variables[var_name].dtype != np.float32:
+            continue
+        keepbits = bitround.get(var_name) if isinstance(bitround, dict) else bitround
+        if keepbits is None:
+            continue
+        quantization = {"significant_digits": keepbits, "quantize_mode": "BitRound"}
+        _set_variable_encoding_defaults(encoding, dataset, var_name, quantization, _QUANTIZATION_KEYS)
+    return encoding
+
+
+def _set_variable_encoding_defaults(encoding, dataset, var_name, defaults, user_keys):
+    """Add default encoding settings to a variable, unless the user specified any of ``user_keys``.
+
+    User settings are looked up in the encoding dictionary or, if the variable is not in
+    there, in the encoding attribute of the variable. The defaults are merged with these
+    into the encoding dictionary, without modifying the user's dictionaries or variables.
+    """
+    if var_name in encoding:
+        var_encoding = encoding[var_name]
+    else:
+        var_encoding = _get_variable_encoding_attribute(dataset.variables[var_name])
+    if not var_encoding.keys() & user_keys:
+        encoding[var_name] = {**defaults, **var_encoding}
+
+
+def _get_variable_encoding_attribute(variable):
+    """Get the encoding attribute of the variable, without the settings describing its source.
+
+    xarray ignores these settings in the encoding attribute, but not in the encoding dictionary,
+    which replaces the encoding attribute. Like xarray, chunksizes are dropped as well if
+    the shape of the variable changed since it was read, or if they exceed the shape.
+    """
+    var_encoding = {key: val for key, val in variable.encoding.items() if key not in _SOURCE_ENCODING_KEYS}
+    chunksizes = var_encoding.get("chunksizes")
+    if chunksizes is not None:
+        changed_shape = tuple(variable.encoding.get("original_shape", variable.shape)) != variable.shape
+        if changed_shape or any(chunk > size for chunk, size in zip(chunksizes, variable.shape)):
+            del var_encoding["chunksizes"]
+    return var_encoding
+
+
+def update_encoding(dataset, to_engine_kwargs, numeric_name_prefix="CHANNEL_", engine=None,
+                    default_compression=False, bitround=None):
     """Update encoding.
 
     Preserve dask chunks, avoid fill values in coordinate variables and make sure that
-    time & time bounds have the same units.
+    time & time bounds have the same units. Compressed numpy-backed data variables without
+    user-defined chunks get chunks of about 4 MiB.
+
+    If ``default_compression`` is True, data variables without user-defined compression
+    are compressed with fast settings suitable for the given netCDF ``engine``. It may also
+    be a dictionary specifying the compression algorithm and level, see
+    :func:`_get_default_compression`.
+
+    If ``bitround`` is given, float32 data variables are quantized with netCDF's BitRound
+    algorithm, keeping the given number of mantissa bits (either for all variables, or
+    per variable name if a dictionary). This improves compression considerably and
+    requires the netcdf4 engine.
     """
-    other_to_engine_kwargs = to_engine_kwargs.copy()
-    encoding = other_to_engine_kwargs.pop("encoding", {}).copy()
+    # Copy the per-variable settings, too, so that the user's dictionaries are not modified
+    encoding = {var_name: dict(var_enc) for var_name, var_enc in to_engine_kwargs.get("encoding", {}).items()}
+    other_to_engine_kwargs = {key: val for key, val in to_engine_kwargs.items() if key != "encoding"}
     encoding = _update_encoding_dataset_names(encoding, dataset, numeric_name_prefix)
     encoding = _set_default_chunks(encoding, dataset)
     encoding = _set_default_fill_value(encoding, dataset)
     encoding = _set_default_time_encoding(encoding, dataset)
+    if default_compression:
+        compression = _get_default_compression(engine, default_compression)
+        encoding = _set_default_compression(encoding, dataset, compression)
+    if bitround is not None:
+        if isinstance(bitround, dict):
+            bitround = _update_encoding_dataset_names(bitround.copy(), dataset, numeric_name_prefix)
+        encoding = _set_default_bitround(encoding, dataset, bitround)
+    encoding = _set_default_compressed_chunks(encoding, dataset)
     return encoding, other_to_engine_kwargs
@@ -58,6 +58,9 @@ class TestCFArea:
         if include_lonlats:
             assert "longitude" in res[1].coords
             assert "latitude" in res[1].coords
+        # original should be unmodified
+        assert "grid_mapping" not in input_data_arr.attrs
+        assert "longitude" not in input_data_arr.coords
 
     def test_area2cf_swath(self, input_data_arr):
         """Test area2cf for swath definitions."""
@@ -269,6 +272,25 @@ class TestCFArea:
         assert {"name": "latitude", "standard_name": "latitude", "units": "degrees_north"}.items() <= lat.attrs.items()
         assert {"name": "longitude", "standard_name": "longitude", "units": "degrees_east"}.items() <= lon.attrs.items()
 
+    def test_area2cf_lonlats_cache(self, input_data_arr):
+        """Test that longitudes and latitudes are computed only once per area."""
+        from unittest import mock
+
+        area = AreaDefinition("geos", "geos", "geos",
+                              {"proj": "geos", "h": 35785831., "a": 6378169., "b": 6356583.8},
+                              2, 2, [-1, -1, 1, 1])
+        input_data_arr.attrs["area"] = area
+        other_data_arr = input_data_arr.copy()
+        other_data_arr.attrs["name"] = "var2"
+
+        lonlats_cache = {}
+        with mock.patch.object(AreaDefinition, "get_lonlats", wraps=area.get_lonlats) as get_lonlats:
+            res1 = area2cf(input_data_arr, include_lonlats=True, lonlats_cache=lonlats_cache)
+            res2 = area2cf(other_data_arr, include_lonlats=True, lonlats_cache=lonlats_cache)
+        get_lonlats.assert_called_once()
+        np.testing.assert_array_equal(res1[1]["longitude"], res2[1]["longitude"])
+        np.testing.assert_array_equal(res1[1]["latitude"], res2[1]["latitude"])
+
 
 def _gm_matches(gmapping, expected):
     """Assert that all keys in ``expected`` match the values in ``gmapping``."""
@@ -42,3 +42,53 @@ class TestCFAttributeEncoding:
         assert json.loads(encoded["array_3d"]) == [[[1, 2], [3, 4]], [[1, 2], [3, 4]]]
         assert json.loads(encoded["nested_dict"]) == {"l1": {"l2": {"l3": [1, 2, 3]}}}
         assert json.loads(encoded["nested_list"]) == ["1", ["2", [3]]]
+
+    def test__encode_nc_attrs_plain(self):
+        """Test encoding of plain attributes, which are only sorted."""
+        from satpy.cf.attrs import encode_attrs_to_cf
+
+        encoded = encode_attrs_to_cf({"b": 1, "a": "a", "c": 1.5})
+        assert list(encoded.items()) == [("a", "a"), ("b", 1), ("c", 1.5)]
+        # Bool has to be encoded, though it is a subclass of int
+        assert encode_attrs_to_cf({"a": True, "b": 1}) == {"a": "true", "b": 1}
+
+    def test__encode_nc_attrs_cache(self):
+        """Test that encodings of values shared among attribute dictionaries are reused."""
+        from satpy.cf.attrs import encode_attrs_to_cf
+
+        shared = {"a": [1, 2]}
+        encode_cache = {}
+        encoded1 = encode_attrs_to_cf({"dict": shared, "b": True}, encode_cache=encode_cache)
+        encoded2 = encode_attrs_to_cf({"dict": shared}, encode_cache=encode_cache)
+        assert encoded1 == {"b": "true", "dict": '{"a": [1, 2]}'}
+        assert encoded2["dict"] is encoded1["dict"]
+        assert encode_cache[id(shared)] == (shared, '{"a": [1, 2]}')
+
+    def test_attribute_encoder_arrays(self):
+        """Test json encoding of non-numeric arrays."""
+        import numpy as np
+
+        from satpy.cf.attrs import AttributeEncoder
+
+        obj = {"bool_2d": np.array([[True], [False]]),
+               "datetime": np.array(["2018-01-01"], dtype="datetime64[D]"),
+               "recarray": np.zeros(2, dtype=[("x", "i4"), ("y", "f4")]),
+               "object": np.array([{"a": True}, [np.uint8(1), True]], dtype=object)}
+        expected = {"bool_2d": [["true"], ["false"]],
+                    "datetime": ["2018-01-01"],
+                    "recarray": [[0, 0.0], [0, 0.0]],
+                    "object": [{"a": "true"}, [1, "true"]]}
+        assert json.loads(json.dumps(obj, cls=AttributeEncoder)) == expected
+
+
+def test_preprocess_attrs_drops_undesirable_attrs():
+    """Test that user-excluded, satpy-internal, None-valued and empty ancillary variables attributes are dropped."""
+    import xarray as xr
+
+    from satpy.cf.attrs import preprocess_attrs
+
+    attrs = {"name": "foo", "long_name": "Foo", "units": "K", "area": "some_area", "_satpy_id": "foo",
+             "_satpy_other": 1, "_last_resampler": "nearest", "empty": None, "ancillary_variables": [], "exclude_me": 1}
+    data_arr = xr.DataArray([1, 2], attrs=attrs)
+    res = preprocess_attrs(data_arr, flatten_attrs=False, exclude_attrs=["exclude_me"])
+    assert res.attrs == {"long_name": "Foo", "name": "foo", "units": "K"}
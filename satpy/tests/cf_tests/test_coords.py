@@ -51,7 +51,19 @@ class TestCFtime:
         assert "bounds" in ds["time"].attrs
         assert "standard_name" in ds["time"].attrs
 
-    # set_cf_time_info
+    def test_set_cf_time_info(self):
+        """Test that a time dimension is only added for a scalar time coordinate."""
+        from satpy.cf.coords import set_cf_time_info
+
+        times = np.array(["2018-05-30T10:05:00", "2018-05-30T10:05:01"], dtype=np.datetime64)
+        scalar = xr.DataArray(np.zeros((1, 2)), dims=("y", "x"), coords={"time": times[0]})
+        res = set_cf_time_info(scalar, epoch=None)
+        assert res.dims == ("time", "y", "x")
+        assert res["time"].attrs["standard_name"] == "time"
+
+        scanline = xr.DataArray(np.zeros((2, 2)), dims=("y", "x"), coords={"time": ("y", times)})
+        res = set_cf_time_info(scanline, epoch=None)
+        assert res.dims == ("y", "x")
 
 
 class TestCFcoords:
@@ -71,6 +83,16 @@ class TestCFcoords:
         with pytest.raises(ValueError, match="must have identical projection coordinates"):
             check_unique_projection_coords(datas)
 
+    def test_check_unique_projection_coords_inner_values(self):
+        """Test that x coordinates differing only in their inner values are not unique."""
+        from satpy.cf.coords import check_unique_projection_coords
+
+        dummy = np.zeros((2, 5))
+        datas = {"a": xr.DataArray(data=dummy, dims=("y", "x"), coords={"y": [1, 2], "x": [1, 2, 3, 4, 5]}),
+                 "b": xr.DataArray(data=dummy, dims=("y", "x"), coords={"y": [1, 2], "x": [1, 2, 3, 6, 5]})}
+        with pytest.raises(ValueError, match="must have identical projection coordinates"):
+            check_unique_projection_coords(datas)
+
     def test_add_coordinates_attrs_coords(self):
         """Check that coordinates link has been established correctly."""
         from satpy.cf.coords import add_coordinates_attrs_coords
@@ -151,6 +173,25 @@ class TestCFcoords:
         assert "var1_acq_time" not in res["var1"].coords
         assert "var2_acq_time" not in res["var2"].coords
 
+    def test_ensure_unique_nondimensional_coords_multiple(self):
+        """Test renaming of several non-dimensional coordinates per dataset."""
+        from satpy.cf.coords import ensure_unique_nondimensional_coords
+
+        data = [[1, 2], [3, 4]]
+        datasets = {name: xr.DataArray(data=data,
+                                       dims=("y", "x"),
+                                       coords={"acq_time": ("y", acq_time), "line": ("y", [5, 6])})
+                    for name, acq_time in [("var1", [1, 2]), ("var2", [3, 4])]}
+
+        res = ensure_unique_nondimensional_coords(datasets)
+        assert set(res["var1"].coords) == {"var1_acq_time", "var1_line"}
+        assert set(res["var2"].coords) == {"var2_acq_time", "var2_line"}
+
+        with pytest.warns(UserWarning, match='Cannot pretty-format "acq_time"'):
+            res = ensure_unique_nondimensional_coords(datasets, pretty=True)
+        assert set(res["var1"].coords) == {"var1_acq_time", "line"}
+        assert set(res["var2"].coords) == {"var2_acq_time", "line"}
+
     def test_is_projected(self, caplog):
         """Tests for private _is_projected function."""
         from satpy.cf.coords import _is_projected
@@ -177,6 +218,21 @@ class TestCFcoords:
             assert _is_projected(da)
         assert "Failed to tell if data are projected." in caplog.text
 
+    def test_is_projected_crs_cache(self):
+        """Test that the projection of equal CRSs is determined only once."""
+        from pyproj import CRS
+
+        from satpy.cf.coords import _is_projected
+
+        crs = CRS.from_epsg(4326)
+        crs_cache = {}
+        da = xr.DataArray(np.arange(4).reshape(2, 2), dims=("y", "x"), coords={"crs": crs})
+        assert not _is_projected(da, crs_cache)
+        assert crs_cache == {crs.srs: False}
+        crs_cache[crs.srs] = True
+        da2 = xr.DataArray(np.arange(4).reshape(2, 2), dims=("y", "x"), coords={"crs": crs})
+        assert _is_projected(da2, crs_cache)
+
     @pytest.fixture
     def datasets(self):
         """Create test dataset."""
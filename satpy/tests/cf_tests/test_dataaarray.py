@@ -114,3 +114,17 @@ class TestCfDataArray:
         arr = xr.DataArray(np.array([1, 2, 3, 4]), attrs={}, dims=("y",),
                            coords={"y": [0, 1, 2, 3], "acq_time": ("y", [0, 1, 2, 3])})
         _ = make_cf_data_array(arr)
+
+    def test_make_cf_dataarray_does_not_modify_input(self):
+        """Test that the input DataArray is not modified, while its data are not copied."""
+        from satpy.cf.data_array import make_cf_data_array
+
+        arr = xr.DataArray(np.array([[1, 2], [3, 4]]), attrs={"name": "1", "_satpy_id_name": "1"}, dims=("y", "x"),
+                           coords={"y": [0, 1], "x": [1, 2], "time": np.datetime64("2018-05-30T10:05:00")})
+        res = make_cf_data_array(arr)
+        assert np.shares_memory(res.data, arr.data)
+        assert arr.attrs == {"name": "1", "_satpy_id_name": "1"}
+        assert arr.name is None
+        assert arr["x"].attrs == {}
+        assert arr["time"].attrs == {}
+        assert arr["time"].encoding == {}
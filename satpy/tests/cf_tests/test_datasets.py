@@ -68,6 +68,11 @@ class TestCollectCfDataset:
         # variable 2
         assert "grid_mapping" not in da_var2.attrs
         assert da_var2.attrs["long_name"] == "variable 2"
+        # The input DataArrays are not modified
+        assert list_dataarrays[0].attrs == {"name": "var1", "start_time": tstart, "end_time": tend, "area": geos}
+        assert list_dataarrays[1].attrs == {"name": "var2", "long_name": "variable 2"}
+        assert set(list_dataarrays[0].coords) == {"y", "x", "acq_time"}
+        assert list_dataarrays[0]["x"].attrs == {}
 
     def test_collect_cf_dataset_with_latitude_named_lat(self):
         """Test collecting CF datasets with latitude named lat."""
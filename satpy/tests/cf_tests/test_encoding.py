@@ -17,6 +17,7 @@
 # satpy.  If not, see <http://www.gnu.org/licenses/>.
 """Tests for compatible netCDF/Zarr DataArray encodings."""
 import datetime
+from unittest import mock
 
 import pytest
 import xarray as xr
@@ -121,3 +122,148 @@ class TestUpdateEncoding:
         assert enc == expected_dict
         # User-defined encoding may not be altered
         assert kwargs["encoding"] == {"bar": {"chunksizes": (1, 1, 1)}}
+
+    def test_default_compression(self, fake_ds):
+        """Test default compression of data variables."""
+        from satpy.cf.encoding import update_encoding
+
+        ds = fake_ds.copy()
+        ds["foo"].encoding = {"zlib": False}
+        kwargs = {"encoding": {"bar": {"complevel": 9}}}
+        enc, _ = update_encoding(ds, kwargs, default_compression=True)
+        # User-defined compression takes precedence
+        assert ds["foo"].encoding == {"zlib": False}
+        assert "foo" not in enc
+        assert enc["bar"] == {"zlib": True, "complevel": 9, "shuffle": True}
+        # Coordinates are not compressed
+        assert enc["x"] == {"_FillValue": None}
+        # User-defined encoding may not be altered
+        assert kwargs["encoding"] == {"bar": {"complevel": 9}}
+
+    def test_default_compression_encoding_attribute(self, fake_ds):
+        """Test that default compression is merged into the encoding attribute of the variables."""
+        from satpy.cf.encoding import update_encoding
+
+        ds = fake_ds.copy()
+        ds["foo"].encoding = {"dtype": "int16", "source": "foo.nc"}
+        enc, _ = update_encoding(ds, {}, default_compression=True)
+        assert enc["foo"] == {"dtype": "int16", "zlib": True, "complevel": 1, "shuffle": True}
+        # The variables are not modified
+        assert ds["foo"].encoding == {"dtype": "int16", "source": "foo.nc"}
+
+        # Chunks of variables whose shape changed since they were read are dropped, like xarray does
+        ds["foo"].encoding = {"chunksizes": (1, 1), "original_shape": (5, 5)}
+        enc, _ = update_encoding(ds, {}, default_compression=True)
+        assert enc["foo"] == {"zlib": True, "complevel": 1, "shuffle": True}
+
+    def test_default_compression_spec(self, fake_ds):
+        """Test default compression with a given algorithm and level."""
+        from satpy.cf.encoding import update_encoding
+
+        spec = {"algorithm": "blosc_zstd", "level": 3}
+        with mock.patch("netCDF4.__has_zstandard_support__", True):
+            enc, _ = update_encoding(fake_ds, {}, engine="netcdf4", default_compression=spec)
+        assert enc["foo"] == {"compression": "zstd", "complevel": 3, "shuffle": True}
+
+        with mock.patch("netCDF4.__has_zstandard_support__", False), \
+                pytest.warns(UserWarning, match="not available for engine netcdf4, using zlib"):
+            enc, _ = update_encoding(fake_ds, {}, engine="netcdf4", default_compression=spec)
+        assert enc["foo"] == {"zlib": True, "complevel": 3, "shuffle": True}
+
+        with pytest.raises(ValueError, match="Unsupported compression algorithm"):
+            update_encoding(fake_ds, {}, default_compression={"algorithm": "lzf"})
+
+    def test_default_compression_blosc_h5netcdf(self, fake_ds):
+        """Test default Blosc compression with the h5netcdf engine."""
+        hdf5plugin = pytest.importorskip("hdf5plugin")
+        from satpy.cf.encoding import update_encoding
+
+        enc, _ = update_encoding(fake_ds, {}, engine="h5netcdf", default_compression={"algorithm": "blosc_zstd"})
+        assert enc["foo"] == dict(hdf5plugin.Blosc(cname="zstd", clevel=1,
+                                                                shuffle=hdf5plugin.Blosc.SHUFFLE))
+
+    def test_user_encoding_is_not_modified(self, fake_ds):
+        """Test that the user-defined encoding dictionaries are not modified."""
+        from satpy.cf.encoding import update_encoding
+
+        kwargs = {"encoding": {"x": {"dtype": "int16"}}, "other": "kwargs"}
+        enc, other_kwargs = update_encoding(fake_ds, kwargs)
+        assert enc["x"] == {"dtype": "int16", "_FillValue": None}
+        assert other_kwargs == {"other": "kwargs"}
+        assert kwargs == {"encoding": {"x": {"dtype": "int16"}}, "other": "kwargs"}
+
+    def test_bitround(self, fake_ds_digit):
+        """Test BitRound quantization of float32 data variables."""
+        from satpy.cf.encoding import update_encoding
+
+        ds = fake_ds_digit.astype("float32")
+        ds["CHANNEL_3"] = ds["CHANNEL_1"].astype("float64")
+        kwargs = {"encoding": {"2": {"significant_digits": 3}}}
+        enc, _ = update_encoding(ds, kwargs, bitround={"1": 10, "2": 10, "3": 10})
+        assert enc["CHANNEL_1"] == {"significant_digits": 10, "quantize_mode": "BitRound"}
+        # User-defined quantization takes precedence
+        assert enc["CHANNEL_2"] == {"significant_digits": 3}
+        # Only float32 variables are quantized
+        assert "CHANNEL_3" not in enc
+
+        ds = fake_ds_digit.astype("float32")
+        enc, _ = update_encoding(ds, {}, bitround=7)
+        assert enc["CHANNEL_2"] == {"significant_digits": 7, "quantize_mode": "BitRound"}
+
+    def test_small_dask_chunks_are_enlarged(self):
+        """Test that small dask chunks are enlarged to whole multiples for the on-disk chunks."""
+        import dask.array as da
+
+        from satpy.cf.encoding import update_encoding
+
+        ds = xr.Dataset({"foo": (("time", "y", "x"), da.zeros((2, 3000, 2000), dtype="float32", chunks=(1, 100, 100))),
+                         "bar": (("a", "b"), da.zeros((300, 50), dtype="float32", chunks=(100, 10)))})
+        enc, _ = update_encoding(ds, {})
+        # 1 x 1000 x 1000 float32 is about 4 MiB
+        assert enc["foo"]["chunksizes"] == (1, 1000, 1000)
+        # Chunks may not exceed shape
+        assert enc["bar"]["chunksizes"] == (300, 50)
+
+    def test_compressed_numpy_chunks(self):
+        """Test default chunks of large compressed numpy-backed data variables."""
+        import numpy as np
+
+        from satpy.cf.encoding import update_encoding
+
+        ds = xr.Dataset({"foo": (("time", "y", "x1"), np.zeros((2, 3000, 500), dtype="float32")),
+                         "bar": (("y", "x"), np.zeros((3000, 2000), dtype="float64")),
+                         "baz": (("y", "x"), np.zeros((3000, 2000), dtype="float32")),
+                         "small": (("a", "b"), np.zeros((30, 20), dtype="float32"))})
+        kwargs = {"encoding": {"bar": {"chunksizes": (10, 10)}}}
+        enc, _ = update_encoding(ds, kwargs, default_compression=True)
+        # 1 x 1024 x 1024 float32 is 4 MiB, chunks may not exceed shape
+        assert enc["foo"]["chunksizes"] == (1, 1024, 500)
+        # User-defined chunks take precedence
+        assert enc["bar"]["chunksizes"] == (10, 10)
+        assert "chunksizes" not in enc["small"]
+
+        ds = ds.drop_vars(["foo", "small"])
+        ds["bar"].encoding = {}
+        ds["baz"].encoding = {"zlib": False}
+        enc, _ = update_encoding(ds, {}, default_compression=True)
+        assert enc["bar"]["chunksizes"] == (512, 512)
+        # Uncompressed variables are left alone
+        assert "baz" not in enc
+
+    def test_align_dask_chunks(self):
+        """Test that dask chunks are aligned to larger on-disk chunks."""
+        import dask.array as da
+
+        from satpy.cf.encoding import align_dask_chunks, update_encoding
+
+        ds = xr.Dataset({"foo": (("y", "x"), da.zeros((3000, 2000), dtype="float32", chunks=(100, 100))),
+                         "bar": (("y", "x"), da.zeros((3000, 2000), dtype="float32", chunks=(1000, 1000)))},
+                        coords={"lon": (("y", "x"), da.zeros((3000, 2000), dtype="float32", chunks=(100, 100)))})
+        kwargs = {"encoding": {"lon": {"chunksizes": (100, 100)}}}
+        enc, _ = update_encoding(ds, kwargs)
+        res = align_dask_chunks(ds, enc)
+        assert res["foo"].data.chunksize == enc["foo"]["chunksizes"] == (1000, 1000)
+        # Already aligned or user-defined on-disk chunks are left alone
+        assert res["bar"].data is ds["bar"].data
+        assert res["lon"].data is ds["lon"].data
+        assert "lon" in res.coords
@@ -61,6 +61,19 @@ class TempFile:
         os.remove(self.filename)
 
 
+def _get_nc_group_contents(filename, group_name):
+    """Get the dimensions and the variables of a netCDF group, with their dimensions, attributes and data."""
+    import netCDF4
+
+    with netCDF4.Dataset(filename) as nc:
+        group = nc if group_name is None else nc[group_name]
+        dims = {name: dim.size for name, dim in group.dimensions.items()}
+        variables = {name: (var.dimensions, var.dtype, {key: str(val) for key, val in var.__dict__.items()},
+                            var[:].tolist())
+                     for name, var in group.variables.items()}
+        return dims, variables
+
+
 class TestCFWriter:
     """Test case for CF writer."""
 
@@ -235,6 +248,103 @@ class TestCFWriter:
             with pytest.raises(ValueError, match="Datasets .* must have identical projection coordinates..*"):
                 scn.save_datasets(datasets=["VIS006", "HRV"], filename=filename, writer="cf")
 
+    def test_groups_with_root_data(self):
+        """Test creating a file with groups and data in the root group of different shape."""
+        tstart = dt.datetime(2019, 4, 1, 12, 0)
+        tend = dt.datetime(2019, 4, 1, 12, 15)
+        scn = Scene()
+        scn["VIS006"] = xr.DataArray([[1, 2], [3, 4]], dims=("y", "x"), coords={"y": [1, 2], "x": [1, 2]},
+                                     attrs={"name": "VIS006", "start_time": tstart, "end_time": tend})
+        scn["HRV"] = xr.DataArray(np.arange(9).reshape(3, 3), dims=("y", "x"),
+                                  coords={"y": [1, 2, 3], "x": [1, 2, 3]},
+                                  attrs={"name": "HRV", "start_time": tstart, "end_time": tend})
+
+        with TempFile() as filename:
+            scn.save_datasets(filename=filename, writer="cf", groups={None: ["VIS006"], "hrv": ["HRV"]},
+                              header_attrs={"sensor": "seviri"})
+            with xr.open_dataset(filename) as nc_root:
+                assert nc_root.attrs["sensor"] == "seviri"
+                np.testing.assert_array_equal(nc_root["VIS006"], scn["VIS006"])
+            with xr.open_dataset(filename, group="hrv") as nc_hrv:
+                np.testing.assert_array_equal(nc_hrv["HRV"], scn["HRV"])
+
+    @pytest.mark.parametrize(("groups", "uses_datatree"), [
+        ({"visir": ["VIS006", "IR_108"], "hrv": ["HRV"]}, True),
+        ({None: ["nocoords"], "visir": ["VIS006", "IR_108"]}, True),
+        # The groups would inherit the coordinates of the root
+        ({None: ["VIS006"], "ir": ["IR_108"]}, False),
+    ])
+    def test_groups_same_with_datatree(self, groups, uses_datatree, monkeypatch):
+        """Test that the groups are written the same way with and without DataTree."""
+        from satpy.writers import cf_writer
+
+        tstart = dt.datetime(2019, 4, 1, 12, 0)
+        attrs = {"start_time": tstart, "end_time": tstart}
+        time = {"time": np.datetime64("2019-04-01T12:00", "ns")}
+        scn = Scene()
+        scn["VIS006"] = xr.DataArray([[1, 2], [3, 4]], dims=("y", "x"), coords={"y": [1, 2], "x": [1, 2], **time},
+                                     attrs={"name": "VIS006", **attrs})
+        scn["IR_108"] = xr.DataArray([[1, 2], [3, 4]], dims=("y", "x"), coords={"y": [1, 2], "x": [1, 2]},
+                                     attrs={"name": "IR_108", **attrs})
+        scn["HRV"] = xr.DataArray(np.arange(9).reshape(3, 3), dims=("y", "x"), coords={"y": [1, 2, 3], **time},
+                                  attrs={"name": "HRV", **attrs})
+        scn["nocoords"] = xr.DataArray(np.arange(3), dims="a", attrs={"name": "nocoords", **attrs})
+
+        def get_groups_contents():
+            with TempFile() as filename:
+                scn.save_datasets(filename=filename, writer="cf", groups=groups)
+                return {group_name: _get_nc_group_contents(filename, group_name) for group_name in groups}
+
+        get_datatree = cf_writer._get_datatree
+        trees = []
+        monkeypatch.setattr(cf_writer, "_get_datatree", lambda *args: trees.append(get_datatree(*args)) or trees[-1])
+        contents_datatree = get_groups_contents()
+        assert (trees[0] is not None) == uses_datatree
+        monkeypatch.setattr(cf_writer, "_get_datatree", lambda *args: None)
+        contents_separate = get_groups_contents()
+        assert contents_datatree == contents_separate
+
+    @pytest.mark.parametrize("engine", ["netcdf4", "h5netcdf"])
+    def test_groups_appended_to_root(self, engine, monkeypatch):
+        """Test creating a file with groups appended one by one to the root file."""
+        from satpy.writers import cf_writer
+
+        monkeypatch.setattr(cf_writer, "_get_datatree", lambda *args: None)
+        tstart = dt.datetime(2019, 4, 1, 12, 0)
+        scn = Scene()
+        scn["VIS006"] = xr.DataArray([[1, 2], [3, 4]], dims=("y", "x"),
+                                     attrs={"name": "VIS006", "start_time": tstart, "end_time": tstart})
+        with TempFile() as filename:
+            scn.save_datasets(filename=filename, writer="cf", engine=engine, groups={"visir": ["VIS006"]},
+                              header_attrs={"sensor": "seviri", "numbers": [1, 2]})
+            with xr.open_dataset(filename) as nc_root:
+                assert nc_root.attrs["sensor"] == "seviri"
+                np.testing.assert_array_equal(nc_root.attrs["numbers"], [1, 2])
+                assert "history" in nc_root.attrs
+            with xr.open_dataset(filename, group="visir") as nc_visir:
+                np.testing.assert_array_equal(nc_visir["VIS006"], scn["VIS006"])
+
+    def test_groups_lazy(self, monkeypatch):
+        """Test that groups are written one by one if the data is to be written lazily."""
+        from satpy.writers import compute_writer_results
+
+        def to_netcdf(*args, **kwargs):
+            raise AssertionError("Older xarray versions can't write a DataTree lazily")
+
+        monkeypatch.setattr(xr.DataTree, "to_netcdf", to_netcdf)
+        tstart = dt.datetime(2019, 4, 1, 12, 0)
+        scn = Scene()
+        scn["VIS006"] = xr.DataArray([[1, 2], [3, 4]], dims=("y", "x"),
+                                     attrs={"name": "VIS006", "start_time": tstart, "end_time": tstart})
+        with TempFile() as filename:
+            res = scn.save_datasets(filename=filename, writer="cf", groups={"visir": ["VIS006"]},
+                                    header_attrs={"sensor": "seviri"}, compute=False)
+            compute_writer_results([res])
+            with xr.open_dataset(filename) as nc_root:
+                assert nc_root.attrs["sensor"] == "seviri"
+            with xr.open_dataset(filename, group="visir") as nc_visir:
+                np.testing.assert_array_equal(nc_visir["VIS006"], scn["VIS006"])
+
     def test_single_time_value(self):
         """Test setting a single time value."""
         scn = Scene()
@@ -528,6 +638,57 @@ class TestNetcdfEncodingKwargs:
             assert f["test-array"].dtype == expected["dtype"]
             assert f["test-array"].encoding["complevel"] == expected["complevel"]
 
+    def test_default_compression(self, scene, filename):
+        """Test 'default_compression' keyword argument."""
+        scene.save_datasets(filename=filename, default_compression=True, engine="netcdf4", writer="cf")
+        with xr.open_dataset(filename) as f:
+            assert f["test-array"].encoding["zlib"]
+            assert f["test-array"].encoding["complevel"] == 1
+            assert f["test-array"].encoding["shuffle"]
+
+    def test_default_compression_zstd(self, scene, filename):
+        """Test that 'default_compression' uses Zstandard via h5netcdf if hdf5plugin is available."""
+        pytest.importorskip("hdf5plugin")
+        scene.save_datasets(filename=filename, default_compression=True, writer="cf")
+        with xr.open_dataset(filename) as f:
+            assert f["test-array"].encoding["zstd"]
+            assert f["test-array"].encoding["complevel"] == 1
+
+    def test_default_compression_blosc(self, scene, filename):
+        """Test that Blosc compression is used via h5netcdf if hdf5plugin is available."""
+        import h5py
+        hdf5plugin = pytest.importorskip("hdf5plugin")
+        scene["test-array"] = xr.DataArray(np.random.default_rng().integers(0, 255, 1000, dtype="uint8"),
+                                           attrs=scene["test-array"].attrs)
+        scene.save_datasets(filename=filename, default_compression={"algorithm": "blosc_zstd", "level": 3},
+                            writer="cf")
+        with h5py.File(filename) as f:
+            assert str(hdf5plugin.Blosc.filter_id) in f["test-array"]._filters
+        with xr.open_dataset(filename, engine="h5netcdf") as f:
+            np.testing.assert_array_equal(f["test-array"], scene["test-array"])
+
+    def test_bitround(self, scene, filename):
+        """Test BitRound quantization of float32 data."""
+        scene["test-array"] = scene["test-array"].astype("float32")
+        scene.save_datasets(filename=filename, engine="netcdf4", bitround=5, writer="cf")
+        with xr.open_dataset(filename) as f:
+            assert f["test-array"].attrs["_QuantizeBitRoundNumberOfSignificantBits"] == 5
+
+    @pytest.mark.parametrize("chunks", [None, 1])
+    def test_bitround_default_engine(self, scene, filename, chunks):
+        """Test that BitRound quantization uses the netcdf4 engine by default, also with default compression."""
+        scene["test-array"] = scene["test-array"].astype("float32")
+        if chunks is not None:
+            scene["test-array"] = scene["test-array"].chunk(chunks)
+        scene.save_datasets(filename=filename, default_compression=True, bitround=5, writer="cf")
+        with xr.open_dataset(filename) as f:
+            assert f["test-array"].attrs["_QuantizeBitRoundNumberOfSignificantBits"] == 5
+
+    def test_bitround_other_engine(self, scene, filename):
+        """Test that BitRound quantization with another engine than netcdf4 raises an error."""
+        with pytest.raises(ValueError, match="requires the 'netcdf4' engine"):
+            scene.save_datasets(filename=filename, engine="h5netcdf", bitround=5, writer="cf")
+
     @pytest.mark.parametrize(
         "versions",
         [
@@ -33,3 +33,19 @@ class WriterUtilsTest(unittest.TestCase):
                     "b_d_e": 1,
                     "b_d_f_g": [1, 2]}
         assert wutils.flatten_dict(d) == expected
+
+    def test_get_cached_by_id(self):
+        """Test caching results by id of the objects."""
+        calls = []
+
+        def func(obj):
+            calls.append(obj)
+            return len(obj)
+
+        cache = {}
+        shared = [1, 2]
+        assert wutils.get_cached_by_id(shared, cache, func) == 2
+        assert wutils.get_cached_by_id(shared, cache, func) == 2
+        assert wutils.get_cached_by_id([1, 2, 3], cache, func) == 3
+        assert calls == [[1, 2], [1, 2, 3]]
+        assert cache[id(shared)] == (shared, 2)
@@ -30,7 +30,9 @@ format:
                           exclude_attrs=['raw_metadata'])
 
 * You can select the netCDF backend using the ``engine`` keyword argument. If `None` if follows
-  :meth:`~xarray.Dataset.to_netcdf` engine choices with a preference for 'netcdf4'.
+  :meth:`~xarray.Dataset.to_netcdf` engine choices with a preference for 'netcdf4'. The only exception is
+  ``default_compression=True`` (see below) with the ``hdf5plugin`` package installed, where 'h5netcdf' is
+  preferred in order to use Zstandard compression, unless ``bitround`` is set, which requires 'netcdf4'.
 * For datasets with area definition you can exclude lat/lon coordinates by setting ``include_lonlats=False``.
   If the area has a projected CRS, units are assumed to be in metre.  If the
   area has a geographic CRS, units are assumed to be in degrees.  The writer
@@ -90,6 +92,34 @@ Dataset encoding can be specified in two ways:
 
 See the `xarray encoding documentation`_ for all encoding options.
 
+Without user-defined chunks, dask-backed data is written in on-disk chunks of about 4 MiB, made up
+of whole dask chunks. Dask arrays with smaller chunks are rechunked accordingly before writing, so
+that each on-disk chunk is written at once. Large compressed numpy-backed data variables get chunks
+of about 4 MiB as well.
+
+Data variables without user-defined compression can be compressed with fast default settings
+(zlib with compression level 1 and byte shuffling) by setting ``default_compression=True``. With
+``engine='h5netcdf'`` and the ``hdf5plugin`` package installed, Zstandard is used instead of zlib.
+
+    >>> scn.save_datasets(writer='cf', filename='compressed_test.nc', default_compression=True)
+
+Instead of ``True``, ``default_compression`` also accepts a dictionary with the compression ``algorithm``
+('zlib', 'zstd' or 'blosc_zstd') and its ``level``. Blosc with Zstandard compresses fast, using several
+threads. It requires the ``hdf5plugin`` package with ``engine='h5netcdf'`` (the default engine if
+``hdf5plugin`` is installed). With the netcdf4 engine, plain Zstandard is used instead if the netCDF
+library supports it. Otherwise zlib is used, with a warning.
+
+    >>> scn.save_datasets(writer='cf', filename='blosc_test.nc',
+    ...                   default_compression={'algorithm': 'blosc_zstd', 'level': 3})
+
+Compression of float32 data can be improved considerably by discarding insignificant mantissa bits
+with netCDF's BitRound quantization. The ``bitround`` keyword specifies the number of bits to keep,
+either for all float32 data variables or per variable name. This requires the netcdf4 engine
+(used by default if ``bitround`` is set) and netCDF4-1.6.0 or newer.
+
+    >>> scn.save_datasets(writer='cf', filename='bitround_test.nc',
+    ...                   default_compression=True, bitround={'IR_108': 12})
+
 .. note::
 
     Chunk-based compression can be specified with the ``compression`` keyword
@@ -153,6 +183,7 @@ This is what the corresponding ``ncdump`` output would look like in this case:
     http://xarray.pydata.org/en/stable/user-guide/io.html?highlight=encoding#writing-encoded-data
 """
 import copy
+import functools
 import logging
 import warnings
 
@@ -214,13 +245,115 @@ def _sanitize_writer_kwargs(writer_kwargs):
 
 
 def _initialize_root_netcdf(filename, engine, header_attrs, to_netcdf_kwargs):
-    """Initialize root empty netCDF."""
-    root = xr.Dataset({}, attrs=header_attrs)
+    """Initialize root empty netCDF.
+
+    If possible, the global attributes are written directly through the backend store of
+    xarray, rather than by encoding and writing an empty dataset.
+    """
     init_nc_kwargs = to_netcdf_kwargs.copy()
     init_nc_kwargs.pop("encoding", None)  # No variables to be encoded at this point
     init_nc_kwargs.pop("unlimited_dims", None)
-    written = [root.to_netcdf(filename, engine=engine, mode="w", **init_nc_kwargs)]
-    return written
+    store_class = _get_root_store_class(engine)
+    if store_class is None or not init_nc_kwargs.keys() <= {"format", "compute"}:
+        root = xr.Dataset({}, attrs=header_attrs)
+        return [root.to_netcdf(filename, engine=engine, mode="w", **init_nc_kwargs)]
+    # Without variables, there is nothing to compute
+    store = store_class.open(filename, mode="w", format=init_nc_kwargs.get("format", "NETCDF4"))
+    try:
+        store.set_attributes(header_attrs)
+    finally:
+        store.close()
+    return []
+
+
+def _get_root_store_class(engine):
+    """Get the xarray backend store class for writing the root of a netCDF file with the given engine."""
+    if engine == "netcdf4" or (engine is None and netCDF4 is not None):
+        return xr.backends.NetCDF4DataStore
+    if engine == "h5netcdf" or (engine is None and h5netcdf is not None):
+        return xr.backends.H5NetCDFStore
+    return None
+
+
+# to_netcdf keyword arguments which apply to a DataTree the same way as to a Dataset
+_DATATREE_TO_NETCDF_KWARGS = {"compute", "invalid_netcdf"}
+
+
+def _get_datatree_path(group_name):
+    """Get the path of the DataTree node for the given netCDF group."""
+    return "/" if group_name is None else "/" + group_name
+
+
+def _get_datatree(grouped_datasets, header_attrs, to_netcdf_kwargs):
+    """Get a DataTree of the grouped datasets, so that all groups can be written at once.
+
+    Writing a DataTree opens the file only once and computes the data of all groups
+    together. Returns None if that is not possible: if xarray is too old, if keyword
+    arguments are given which the DataTree doesn't support the same way, if the data
+    is to be written lazily, or if the root group holds coordinates. The groups would
+    inherit these, so that they would not be written the same way as separate datasets.
+    """
+    if not hasattr(xr, "DataTree") or not to_netcdf_kwargs.keys() <= _DATATREE_TO_NETCDF_KWARGS:
+        return None
+    if not to_netcdf_kwargs.get("compute", True):
+        # The first xarray versions providing the DataTree can't write it lazily
+        return None
+    root = grouped_datasets.get(None, xr.Dataset())
+    if root.coords:
+        return None
+    tree_dict = {_get_datatree_path(group_name): ds for group_name, ds in grouped_datasets.items()}
+    tree_dict["/"] = root.assign_attrs({**header_attrs, **root.attrs})
+    try:
+        return xr.DataTree.from_dict(tree_dict)
+    except ValueError:
+        return None
+
+
+def _get_engine(engine, default_compression, bitround=None):
+    """Get the netCDF engine.
+
+    BitRound quantization requires the netcdf4 engine, which is chosen if no engine is
+    specified. Otherwise, if no engine is specified and default compression is requested,
+    prefer h5netcdf when the hdf5plugin package provides the Zstandard filter for it.
+    Otherwise leave the choice to xarray.
+    """
+    if bitround is not None:
+        if engine is None and netCDF4 is not None:
+            return "netcdf4"
+        if engine != "netcdf4":
+            raise ValueError(f"BitRound quantization requires the 'netcdf4' engine, got {engine}.")
+        return engine
+    if engine is None and default_compression and h5netcdf is not None:
+        try:
+            import hdf5plugin  # noqa: F401
+        except ImportError:
+            return None
+        return "h5netcdf"
+    return engine
+
+
+@functools.cache
+def _register_blosc_filter():
+    """Register the Blosc filter of hdf5plugin with h5py, once.
+
+    The Blosc filter bundled with netCDF4 may shadow the one of hdf5plugin, but fails on
+    incompressible data.
+    """
+    import hdf5plugin
+
+    hdf5plugin.register("blosc", force=True)
+
+
+def _prepare_default_compression(engine, default_compression):
+    """Prepare writing with the given default compression settings."""
+    if engine != "h5netcdf" or not isinstance(default_compression, dict):
+        return
+    if default_compression.get("algorithm") == "blosc_zstd":
+        try:
+            _register_blosc_filter()
+        except ImportError:
+            # Without hdf5plugin, zlib is used instead
+            pass
 
 
 class CFWriter(Writer):
@@ -232,7 +365,8 @@ class CFWriter(Writer):
 
     def save_datasets(self, datasets, filename=None, groups=None, header_attrs=None, engine=None, epoch=None,  # noqa: D417
                       flatten_attrs=False, exclude_attrs=None, include_lonlats=True, pretty=False,
-                      include_orig_name=True, numeric_name_prefix="CHANNEL_", **to_netcdf_kwargs):
+                      include_orig_name=True, numeric_name_prefix="CHANNEL_", default_compression=False,
+                      bitround=None, **to_netcdf_kwargs):
         """Save the given datasets in one netCDF file.
 
         Note that all datasets (if grouping: in one group) must have the same projection coordinates.
@@ -246,7 +380,9 @@ class CFWriter(Writer):
                 Warning: The results will not be fully CF compliant!
             header_attrs: Global attributes to be included.
             engine (str, optional): Module to be used for writing netCDF files. Follows xarray's
-                :meth:`~xarray.Dataset.to_netcdf` engine choices with a preference for 'netcdf4'.
+                :meth:`~xarray.Dataset.to_netcdf` engine choices with a preference for 'netcdf4', unless
+                ``default_compression`` is set and Zstandard compression is available for 'h5netcdf'.
+                'netcdf4' is always used if ``bitround`` is set.
             epoch (str, optional): Reference time for encoding of time coordinates.
                 If None, the default reference time is defined using `from satpy.cf.coords import EPOCH`.
             flatten_attrs (bool, optional): If True, flatten dict-type attributes.
@@ -259,13 +395,22 @@ class CFWriter(Writer):
                 attribute in the final netCDF.
             numeric_name_prefix (str, optional): Prefix to add to each variable with a name starting with a digit.
                 Use '' or None to leave this out.
+            default_compression (bool or dict, optional): Compress data variables without user-defined
+                compression using fast settings suitable for the chosen ``engine``, or using the compression
+                ``algorithm`` and ``level`` given in a dictionary. Defaults to False.
+            bitround (int or dict, optional): Number of mantissa bits to keep when quantizing float32 data
+                variables with the BitRound algorithm, either for all of them or per variable name.
+                Requires the 'netcdf4' engine, a ValueError is raised for other engines. Defaults to None
+                (no quantization).
         """
         from satpy.cf.datasets import collect_cf_datasets
-        from satpy.cf.encoding import update_encoding
+        from satpy.cf.encoding import align_dask_chunks, update_encoding
 
         logger.info("Saving datasets to NetCDF4/CF.")
         _check_backend_versions()
 
+        engine = _get_engine(engine, default_compression, bitround)
+
         # Define netCDF filename if not provided
         # - It infers the name from the first DataArray
         filename = filename or self.get_filename(**datasets[0].attrs)
@@ -286,7 +431,30 @@ class CFWriter(Writer):
         # - This kwargs can contain encoding dictionary
         to_netcdf_kwargs = _sanitize_writer_kwargs(to_netcdf_kwargs)
 
-        # If writing grouped netCDF, create an empty "root" netCDF file
+        # Update the encoding of each group
+        grouped_encodings = {}
+        for group_name, ds in grouped_datasets.items():
+            encoding, other_to_netcdf_kwargs = update_encoding(ds,
+                                                               to_engine_kwargs=to_netcdf_kwargs,
+                                                               numeric_name_prefix=numeric_name_prefix,
+                                                               engine=engine,
+                                                               default_compression=default_compression,
+                                                               bitround=bitround)
+            grouped_datasets[group_name] = align_dask_chunks(ds, encoding)
+            grouped_encodings[group_name] = encoding
+
+        _prepare_default_compression(engine, default_compression)
+
+        # If writing grouped netCDF, write all groups through a single open file if possible
+        if groups is not None:
+            tree = _get_datatree(grouped_datasets, header_attrs, other_to_netcdf_kwargs)
+            if tree is not None:
+                encoding = {_get_datatree_path(group_name): encoding
+                            for group_name, encoding in grouped_encodings.items()}
+                return [tree.to_netcdf(filename, engine=engine, mode="w", encoding=encoding,
+                                       **other_to_netcdf_kwargs)]
+
+        # Otherwise, if writing grouped netCDF, create an empty "root" netCDF file
         # - Add the global attributes
         # - All groups will be appended in the for loop below
         if groups is not None:
@@ -303,14 +471,11 @@ class CFWriter(Writer):
         # - If grouped netCDF, it appends to the root file
         # - If single netCDF, it write directly
         for group_name, ds in grouped_datasets.items():
-            encoding, other_to_netcdf_kwargs = update_encoding(ds,
-                                                               to_engine_kwargs=to_netcdf_kwargs,
-                                                               numeric_name_prefix=numeric_name_prefix)
             res = ds.to_netcdf(filename,
                                engine=engine,
                                group=group_name,
                                mode=mode,
-                               encoding=encoding,
+                               encoding=grouped_encodings[group_name],
                                **other_to_netcdf_kwargs)
             written.append(res)
         return written
@@ -23,11 +23,29 @@ def flatten_dict(d, parent_key="", sep="_"):
 
     Based on https://stackoverflow.com/a/6027615/5703449
     """
-    items = []
+    flat = {}
+    _flatten_dict_into(flat, d, parent_key, sep)
+    return flat
+
+
+def _flatten_dict_into(flat, d, parent_key, sep):
+    """Add the flattened items of *d* to *flat*, without building intermediate dictionaries."""
     for k, v in d.items():
         new_key = parent_key + sep + k if parent_key else k
         if isinstance(v, dict):
-            items.extend(flatten_dict(v, parent_key=new_key, sep=sep).items())
+            _flatten_dict_into(flat, v, new_key, sep)
         else:
-            items.append((new_key, v))
-    return dict(items)
+            flat[new_key] = v
+
+
+def get_cached_by_id(obj, cache, func):
+    """Get ``func(obj)``, reusing the result for objects shared among several calls.
+
+    Results are cached in the dictionary *cache* by ``id`` of the object. The object itself is
+    kept in the cache, too, so that its ``id`` cannot be reused by another object while the cache
+    is alive.
+    """
+    key = id(obj)
+    if key not in cache:
+        cache[key] = (obj, func(obj))
+    return cache[key][1]